@@ -0,0 +1,119 @@
+"""Import-time instrumentation for cold start measurements.
+
+Set ``DJANGO_IMPORT_PROFILE=1`` and ``config.wsgi`` installs an ``__import__``
+hook before Django is loaded. Once the application is ready, and again when
+the first response starts, the slowest modules (by cumulative and self time)
+are logged together with the time-to-first-byte of the fresh process.
+"""
+import builtins
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_original_import = builtins.__import__
+_records = {}  # module name -> (cumulative seconds, self seconds)
+_state = threading.local()
+
+
+def _absolute_name(name, globals, level):
+    if not level:
+        return name
+    package = (globals or {}).get('__package__') or ''
+    try:
+        return importlib.util.resolve_name('.' * level + name, package)
+    except (ImportError, ValueError):
+        return name
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    module_name = _absolute_name(name, globals, level)
+    is_new = module_name not in sys.modules
+    # ``from package import submodule`` on an already imported package
+    pending = [] if is_new else [
+        f'{module_name}.{item}' for item in fromlist or ()
+        if item != '*' and f'{module_name}.{item}' not in sys.modules
+    ]
+    if not is_new and not pending:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = getattr(_state, 'stack', None)
+    if stack is None:
+        stack = _state.stack = []
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        loaded = [module_name] if is_new else [item for item in pending if item in sys.modules]
+        if loaded:
+            _records.setdefault(', '.join(loaded), (elapsed, elapsed - children))
+
+
+def install():
+    """Start recording first-import times for every module"""
+    builtins.__import__ = _timed_import
+
+
+def uninstall():
+    builtins.__import__ = _original_import
+
+
+def top_modules(limit=15, key='cumulative'):
+    index = 0 if key == 'cumulative' else 1
+    return sorted(_records.items(), key=lambda item: item[1][index], reverse=True)[:limit]
+
+
+def package_totals(limit=15):
+    """Cumulative import time per top-level package"""
+    totals = {}
+    for module_name, (cumulative, own) in _records.items():
+        package = module_name.split('.')[0]
+        totals[package] = totals.get(package, 0.0) + own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def report(label, limit=15):
+    lines = [f'Import profile ({label}): {len(_records)} modules']
+    lines.append('  slowest packages (self time):')
+    lines.extend(f'    {seconds * 1000:8.1f}ms  {name}' for name, seconds in package_totals(limit))
+    lines.append('  slowest modules (cumulative):')
+    lines.extend(
+        f'    {cumulative * 1000:8.1f}ms  {name}'
+        for name, (cumulative, _) in top_modules(limit)
+    )
+    logger.info('\n'.join(lines))
+
+
+class FirstRequestTimer:
+    """WSGI wrapper logging time-to-first-byte for the first request of a process"""
+
+    def __init__(self, application, started):
+        self.application = application
+        self.started = started
+        self.reported = False
+
+    def __call__(self, environ, start_response):
+        if self.reported:
+            return self.application(environ, start_response)
+
+        def timed_start_response(status, headers, exc_info=None):
+            if not self.reported:
+                self.reported = True
+                ttfb = time.perf_counter() - self.started
+                report('first response')
+                logger.info(
+                    'Time to first byte: %.1fms (%s %s)',
+                    ttfb * 1000, environ.get('REQUEST_METHOD'), environ.get('PATH_INFO')
+                )
+                uninstall()
+            return start_response(status, headers, exc_info)
+
+        return self.application(environ, timed_start_response)
@@ -1,10 +1,12 @@
 """Django settings for config project."""
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless the platform provides
+# them directly (serverless deployments skip the file lookup on cold start)
+if os.getenv('DJANGO_SKIP_DOTENV') != 'True':
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +32,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'services_marketplace.middleware.CompressionMiddleware',
+    'services_marketplace.middleware.LoadSheddingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +83,21 @@ else:
         }
     }
 
+# Cache (shared across workers when REDIS_URL is set)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -109,9 +128,30 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'services_marketplace.throttling.UserTokenBucketThrottle',
+        'services_marketplace.throttling.EndpointTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.getenv('THROTTLE_RATE_USER', '240/min'),
+        'search': os.getenv('THROTTLE_RATE_SEARCH', '30/min'),
+        'deep_pagination': os.getenv('THROTTLE_RATE_DEEP_PAGINATION', '20/min'),
+        'batch': os.getenv('THROTTLE_RATE_BATCH', '30/min'),
+    },
 }
 
+# Response compression (Brotli when the brotli package is installed, else gzip)
+# Only JSON under this prefix is compressed; HTML with CSRF tokens is left alone
+COMPRESSION_PATH_PREFIX = os.getenv('COMPRESSION_PATH_PREFIX', '/api/')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+
+# Load shedding for low-priority requests (exports, analytics) under peak load
+LOAD_SHEDDING_LATENCY_THRESHOLD = float(os.getenv('LOAD_SHEDDING_LATENCY_THRESHOLD', '1.0'))
+LOAD_SHEDDING_MAX_IN_FLIGHT = int(os.getenv('LOAD_SHEDDING_MAX_IN_FLIGHT', '0')) or None
+LOAD_SHEDDING_RETRY_AFTER = int(os.getenv('LOAD_SHEDDING_RETRY_AFTER', '5'))
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = os.getenv('CORS_ALLOW_ALL_ORIGINS', 'True') == 'True'
 CORS_ALLOW_CREDENTIALS = os.getenv('CORS_ALLOW_CREDENTIALS', 'True') == 'True'
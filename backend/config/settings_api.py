@@ -0,0 +1,62 @@
+"""API-only settings for short-lived (serverless) instances.
+
+Drops the admin, sessions, messages and static files apps, their
+middleware, session authentication and the browsable API so a fresh process
+imports as little as possible before its first response. CORS stays off
+unless ``API_ENABLE_CORS=True``; the Netlify frontend is expected to reach
+the API through a same-origin proxy.
+
+Run with ``DJANGO_SETTINGS_MODULE=config.settings_api`` and, where the
+platform provides the environment, ``DJANGO_SKIP_DOTENV=True``.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+ENABLE_CORS = os.getenv('API_ENABLE_CORS', 'False') == 'True'
+
+SLIM_EXCLUDED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+SLIM_EXCLUDED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+if not ENABLE_CORS:
+    SLIM_EXCLUDED_APPS.add('corsheaders')
+    SLIM_EXCLUDED_MIDDLEWARE.add('corsheaders.middleware.CorsMiddleware')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in SLIM_EXCLUDED_APPS]
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in SLIM_EXCLUDED_MIDDLEWARE]
+
+ROOT_URLCONF = 'config.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.TokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
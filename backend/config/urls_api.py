@@ -0,0 +1,11 @@
+"""config/urls_api.py - API-only URLs used by config.settings_api"""
+from django.urls import path, include
+from rest_framework.authtoken import views as auth_views
+
+urlpatterns = [
+    # Authentication
+    path('api/auth/', auth_views.obtain_auth_token, name='api-token-auth'),
+
+    # Services Marketplace API
+    path('api/services/', include('services_marketplace.urls')),
+]
@@ -3,14 +3,29 @@ WSGI config for config project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Set ``DJANGO_IMPORT_PROFILE=1`` to log module import costs and the
+time-to-first-byte of a fresh process (see ``config.importtime``).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
 import os
+import time
+
+_started = time.perf_counter()
+_profile_imports = os.getenv('DJANGO_IMPORT_PROFILE') == '1'
+
+if _profile_imports:
+    from config import importtime
+    importtime.install()
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+if _profile_imports:
+    importtime.report('application ready')
+    application = importtime.FirstRequestTimer(application, _started)
@@ -1,5 +1,36 @@
+from django import forms
 from django.contrib import admin
-from .models import ServiceCategory, ServiceProvider, Service, ServiceBooking, ServiceReview, SavedService
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import (
+    ServiceCategory, ServiceProvider, Service, ServiceBooking, ServiceReview, SavedService,
+    ArchivedServiceBooking, ArchivedServiceReview
+)
+from .catalog_import import CatalogImportError, CatalogImporter, detect_format, read_catalog
+from .paginators import EstimatedCountPaginator
+
+class LargeTableAdminMixin:
+    """Changelist settings for tables that grow into the millions of rows.
+
+    Counts are estimated, the filtered/total double count is skipped, and
+    search is routed to indexed lookups: numeric terms match the primary key,
+    terms containing '@' match ``search_email_field`` exactly, and anything
+    else falls through to ``search_fields`` (prefix/exact lookups only).
+    Case-insensitive user email and service name lookups are served by the
+    indexes from migration 0008; other fields need a matching index.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_email_field = None
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        if '@' in term and self.search_email_field:
+            return queryset.filter(**{self.search_email_field: term}), False
+        return super().get_search_results(request, queryset, term)
 
 @admin.register(ServiceCategory)
 class ServiceCategoryAdmin(admin.ModelAdmin):
@@ -15,12 +46,22 @@ class ServiceProviderAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'created_at')
     readonly_fields = ('created_at', 'updated_at')
 
+class CatalogImportForm(forms.Form):
+    catalog = forms.FileField(help_text="CSV, JSON or JSON lines catalog file")
+    dry_run = forms.BooleanField(required=False, initial=True, help_text="Only report what would change")
+    deactivate_missing = forms.BooleanField(
+        required=False, initial=True,
+        help_text="Deactivate the providers' services that are missing from the file"
+    )
+
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ('name', 'provider', 'category', 'price', 'service_type', 'is_active')
     list_filter = ('service_type', 'is_active', 'category', 'created_at')
+    list_select_related = ('provider', 'category')
     search_fields = ('name', 'description', 'provider__name')
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('provider', 'category')
     fieldsets = (
         (None, {
             'fields': ('provider', 'category', 'name', 'description')
@@ -37,24 +78,101 @@ class ServiceAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_urls(self):
+        urls = [
+            path(
+                'import-catalog/',
+                self.admin_site.admin_view(self.import_catalog_view),
+                name='services_marketplace_service_import_catalog',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_catalog_view(self, request):
+        """Upload a provider catalog and upsert it, optionally as a dry run"""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+
+        importer = None
+        form = CatalogImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            upload = form.cleaned_data['catalog']
+            importer = CatalogImporter(
+                dry_run=form.cleaned_data['dry_run'],
+                deactivate_missing=form.cleaned_data['deactivate_missing'],
+            )
+            try:
+                importer.run(read_catalog(upload.file, detect_format(upload.name)))
+            except CatalogImportError as exc:
+                form.add_error('catalog', str(exc))
+                importer = None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import catalog',
+            'form': form,
+            'importer': importer,
+        }
+        return TemplateResponse(
+            request, 'admin/services_marketplace/service/import_catalog.html', context
+        )
+
 @admin.register(ServiceBooking)
-class ServiceBookingAdmin(admin.ModelAdmin):
+class ServiceBookingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'service', 'user', 'status', 'start_date', 'created_at')
     list_filter = ('status', 'start_date', 'created_at')
-    search_fields = ('user__email', 'service__name', 'notes')
+    list_select_related = ('service__provider', 'user')
+    search_fields = ('^service__name',)
+    search_email_field = 'user__email__iexact'
+    search_help_text = 'Booking id, user email or service name prefix'
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('service', 'user')
     date_hierarchy = 'start_date'
 
 @admin.register(ServiceReview)
-class ServiceReviewAdmin(admin.ModelAdmin):
+class ServiceReviewAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('booking', 'rating', 'created_at')
     list_filter = ('rating', 'created_at')
-    search_fields = ('booking__user__email', 'booking__service__name', 'comment')
+    list_select_related = ('booking__service', 'booking__user')
+    search_fields = ('^booking__service__name',)
+    search_email_field = 'booking__user__email__iexact'
+    search_help_text = 'Review id, user email or service name prefix'
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('booking',)
 
 @admin.register(SavedService)
-class SavedServiceAdmin(admin.ModelAdmin):
+class SavedServiceAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'service', 'created_at')
-    search_fields = ('user__email', 'service__name')
+    list_select_related = ('user', 'service__provider')
+    search_fields = ('^service__name',)
+    search_email_field = 'user__email__iexact'
+    autocomplete_fields = ('user', 'service')
     list_filter = ('created_at',)
     readonly_fields = ('created_at',)
+
+class ReadOnlyArchiveAdmin(admin.ModelAdmin):
+    """Archived rows are history; they are only written by archive_bookings"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArchivedServiceBooking)
+class ArchivedServiceBookingAdmin(LargeTableAdminMixin, ReadOnlyArchiveAdmin):
+    list_display = ('id', 'service', 'user', 'status', 'start_date', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    list_select_related = ('service__provider', 'user')
+    search_fields = ('^service__name',)
+    search_email_field = 'user__email__iexact'
+    date_hierarchy = 'start_date'
+
+@admin.register(ArchivedServiceReview)
+class ArchivedServiceReviewAdmin(LargeTableAdminMixin, ReadOnlyArchiveAdmin):
+    list_display = ('booking', 'rating', 'created_at', 'archived_at')
+    list_filter = ('rating',)
+    list_select_related = ('booking__service', 'booking__user')
+    search_fields = ('^booking__service__name',)
+    search_email_field = 'booking__user__email__iexact'
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ServicesMarketplaceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'services_marketplace'
+    verbose_name = 'Services Marketplace'
+
+    def ready(self):
+        # Connect model signal handlers
+        from . import signals  # noqa: F401
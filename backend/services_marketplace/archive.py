@@ -0,0 +1,149 @@
+"""Archival of old ServiceBooking and ServiceReview rows.
+
+Completed and cancelled bookings whose start_date is older than the archive
+horizon are copied, together with their reviews, into the archive tables and
+then removed from the live tables. Each batch runs in its own transaction and
+is idempotent, so an interrupted run can simply be restarted.
+"""
+import heapq
+from datetime import timedelta
+from functools import cmp_to_key
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    ServiceBooking, ServiceReview, ArchivedServiceBooking, ArchivedServiceReview
+)
+from .signals import suppress_recommendation_refresh
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled')
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_archive_horizon():
+    """Bookings starting before this date are eligible for archival"""
+    days = getattr(settings, 'SERVICES_ARCHIVE_AFTER_DAYS', 365)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archivable_bookings(before=None):
+    return ServiceBooking.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        start_date__lt=before or get_archive_horizon()
+    )
+
+
+def archive_batch(before=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Archive up to ``batch_size`` bookings; returns (bookings, reviews) moved"""
+    now = timezone.now()
+    with transaction.atomic():
+        bookings = list(
+            archivable_bookings(before).order_by('pk')[:batch_size]
+        )
+        if not bookings:
+            return 0, 0
+        booking_ids = [booking.pk for booking in bookings]
+        reviews = list(ServiceReview.objects.filter(booking_id__in=booking_ids))
+
+        ArchivedServiceBooking.objects.bulk_create([
+            ArchivedServiceBooking(
+                id=booking.pk,
+                service_id=booking.service_id,
+                user_id=booking.user_id,
+                status=booking.status,
+                start_date=booking.start_date,
+                end_date=booking.end_date,
+                notes=booking.notes,
+                created_at=booking.created_at,
+                updated_at=booking.updated_at,
+                archived_at=now,
+            )
+            for booking in bookings
+        ], ignore_conflicts=True)
+        ArchivedServiceReview.objects.bulk_create([
+            ArchivedServiceReview(
+                id=review.pk,
+                booking_id=review.booking_id,
+                rating=review.rating,
+                comment=review.comment,
+                created_at=review.created_at,
+                updated_at=review.updated_at,
+                archived_at=now,
+            )
+            for review in reviews
+        ], ignore_conflicts=True)
+
+        # Archived rows still feed recommendations, so moving them changes
+        # no user's interactions and needs no per-row refresh
+        with suppress_recommendation_refresh():
+            ServiceBooking.objects.filter(pk__in=booking_ids).delete()
+    return len(bookings), len(reviews)
+
+
+def archive_bookings(before=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """Archive eligible bookings in batches, yielding (bookings, reviews) per batch"""
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(before, batch_size)
+        if not moved[0]:
+            return
+        batches += 1
+        yield moved
+
+
+class MergedHistory:
+    """Lazily merged view of live and archived querysets sharing an ordering.
+
+    Supports ``count()`` and slicing so it can be handed to a paginator:
+    a slice ``[start:stop]`` reads at most ``stop`` rows from each queryset
+    and merges them, instead of loading a user's whole history.
+    """
+
+    def __init__(self, querysets, ordering):
+        ordering = list(ordering or ['-created_at'])
+        self.querysets = [queryset.order_by(*ordering) for queryset in querysets]
+        self.ordering = ordering
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = sum(queryset.count() for queryset in self.querysets)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _compare(self, left, right):
+        for field in self.ordering:
+            name = field.lstrip('-')
+            a, b = getattr(left, name), getattr(right, name)
+            if a == b:
+                continue
+            result = -1 if a < b else 1
+            return -result if field.startswith('-') else result
+        return 0
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None:
+            stop = self.count()
+        if stop <= start:
+            return []
+        merged = heapq.merge(
+            *(queryset[:stop] for queryset in self.querysets),
+            key=cmp_to_key(self._compare)
+        )
+        return list(islice(merged, start, stop))
+
+
+def merge_history(querysets, ordering):
+    """Merge live and archived rows into one lazily paginated sequence"""
+    return MergedHistory(querysets, ordering)
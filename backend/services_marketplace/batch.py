@@ -0,0 +1,105 @@
+"""Run several GET requests against the marketplace routes in one round trip.
+
+Sub-requests reuse the outer request's authenticated user and token, so
+authentication and middleware run once. Sequential sub-requests share the
+request's database connection; concurrent ones each use a worker thread
+connection that is closed when the thread finishes its sub-request.
+"""
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.viewsets import ViewSetMixin
+
+logger = logging.getLogger(__name__)
+
+APP_NAMESPACE = 'services_marketplace'
+
+
+def get_batch_limits():
+    return (
+        getattr(settings, 'SERVICES_BATCH_MAX_REQUESTS', 20),
+        getattr(settings, 'SERVICES_BATCH_MAX_WORKERS', 4),
+    )
+
+
+def _resolve_route(path):
+    """Return the URL match for a marketplace router route, or None"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if match.app_name != APP_NAMESPACE or view_class is None:
+        return None
+    if not issubclass(view_class, ViewSetMixin):
+        return None
+    return match
+
+
+def _build_subrequest(request, path, query):
+    """Clone the outer Django request as a GET with shared authentication"""
+    subrequest = copy.copy(request._request)
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.GET = QueryDict(query)
+    subrequest.META = {
+        **request._request.META,
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+    }
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def run_subrequest(request, url):
+    parts = urlsplit(url)
+    match = _resolve_route(parts.path)
+    if match is None:
+        return {
+            'path': url,
+            'status': status.HTTP_404_NOT_FOUND,
+            'body': {'detail': 'Not a batchable marketplace route.'},
+        }
+
+    subrequest = _build_subrequest(request, parts.path, parts.query)
+    subrequest.resolver_match = match
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Batch sub-request to %s failed', url)
+        return {
+            'path': url,
+            'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+            'body': {'detail': 'Sub-request failed.'},
+        }
+    return {
+        'path': url,
+        'status': response.status_code,
+        'body': getattr(response, 'data', None),
+    }
+
+
+def _run_in_worker(request, url):
+    try:
+        return run_subrequest(request, url)
+    finally:
+        connections.close_all()
+
+
+def run_batch(request, urls, concurrent=False):
+    """Run GET sub-requests for ``urls``, returning results in request order"""
+    if not concurrent or len(urls) < 2:
+        return [run_subrequest(request, url) for url in urls]
+
+    _, max_workers = get_batch_limits()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(executor.map(lambda url: _run_in_worker(request, url), urls))
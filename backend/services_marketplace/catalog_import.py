@@ -0,0 +1,344 @@
+"""Bulk import/upsert of provider service catalogs.
+
+Catalog files (CSV, JSON or JSON lines) are read row by row and written in
+batches with ``bulk_create(update_conflicts=True)`` keyed on the natural
+keys: provider name, category name and (provider, service name). CSV and
+JSON lines are streamed; a JSON document is parsed whole, so large catalogs
+should use JSON lines. Services of the imported providers that are missing
+from the file are deactivated in a single UPDATE at the end.
+
+Recognised columns/keys::
+
+    provider, provider_email, provider_website, provider_phone,
+    provider_description, category, category_icon, category_description,
+    name, description, price, price_unit, service_type, is_active
+"""
+import csv
+import io
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .facets import bump_catalog_version
+from .models import ServiceCategory, ServiceProvider, Service
+
+CATALOG_FORMATS = ('csv', 'json', 'jsonl')
+DEFAULT_BATCH_SIZE = 500
+
+PROVIDER_COLUMNS = {
+    'provider_email': 'contact_email',
+    'provider_website': 'website',
+    'provider_phone': 'contact_phone',
+    'provider_description': 'description',
+}
+CATEGORY_COLUMNS = {
+    'category_icon': 'icon',
+    'category_description': 'description',
+}
+SERVICE_FIELDS = ('category_id', 'description', 'price', 'price_unit', 'service_type', 'is_active')
+SERVICE_TYPES = dict(Service.SERVICE_TYPE_CHOICES)
+PRICE_FIELD = Service._meta.get_field('price')
+PRICE_QUANTUM = Decimal(1).scaleb(-PRICE_FIELD.decimal_places)
+# Smallest value that no longer fits once rounded to decimal_places
+MAX_PRICE = Decimal(10) ** (PRICE_FIELD.max_digits - PRICE_FIELD.decimal_places) - PRICE_QUANTUM / 2
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+# Rejected per row so one over-long value cannot fail a whole batch
+COLUMN_MAX_LENGTHS = {
+    column: model._meta.get_field(field).max_length
+    for column, model, field in [
+        ('provider', ServiceProvider, 'name'),
+        ('category', ServiceCategory, 'name'),
+        ('name', Service, 'name'),
+        ('price_unit', Service, 'price_unit'),
+        *((column, ServiceProvider, field) for column, field in PROVIDER_COLUMNS.items()),
+        *((column, ServiceCategory, field) for column, field in CATEGORY_COLUMNS.items()),
+    ]
+    if model._meta.get_field(field).max_length
+}
+
+
+class CatalogImportError(Exception):
+    """Raised for unreadable catalog files"""
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension == 'ndjson':
+        extension = 'jsonl'
+    if extension not in CATALOG_FORMATS:
+        raise CatalogImportError(
+            f"Unsupported catalog format '{extension}'; expected one of {', '.join(CATALOG_FORMATS)}"
+        )
+    return extension
+
+
+def read_catalog(fileobj, fmt):
+    """Yield (line_number, row dict) pairs from a text or binary file object"""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(fileobj)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(fileobj, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                raise CatalogImportError(f'Invalid JSON on line {line_number}: {exc}')
+            yield line_number, row
+    elif fmt == 'json':
+        try:
+            data = json.load(fileobj)
+        except ValueError as exc:
+            raise CatalogImportError(f'Invalid JSON catalog: {exc}')
+        if isinstance(data, dict):
+            data = data.get('services', [])
+        for index, row in enumerate(data, start=1):
+            yield index, row
+    else:
+        raise CatalogImportError(f"Unsupported catalog format '{fmt}'")
+
+
+def _text(row, key):
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def parse_row(row):
+    """Normalize a raw catalog row; raises ValueError with a readable message"""
+    if not isinstance(row, dict):
+        raise ValueError('expected an object with catalog columns')
+    parsed = {key: _text(row, key) for key in ('provider', 'category', 'name', 'price_unit')}
+    for key in ('provider', 'name', 'price_unit'):
+        if not parsed[key]:
+            raise ValueError(f"'{key}' is required")
+    for column, max_length in COLUMN_MAX_LENGTHS.items():
+        if len(_text(row, column)) > max_length:
+            raise ValueError(f"'{column}' is longer than {max_length} characters")
+
+    parsed['description'] = _text(row, 'description')
+    raw_price = _text(row, 'price')
+    try:
+        price = Decimal(raw_price)
+    except InvalidOperation:
+        raise ValueError(f"invalid price '{raw_price}'")
+    if not price.is_finite():
+        raise ValueError(f"invalid price '{raw_price}'")
+    if price < 0:
+        raise ValueError(f"price '{raw_price}' is negative")
+    if price >= MAX_PRICE:
+        raise ValueError(f"price '{raw_price}' exceeds {PRICE_FIELD.max_digits} digits")
+    parsed['price'] = price.quantize(PRICE_QUANTUM)
+
+    parsed['service_type'] = _text(row, 'service_type') or 'one_time'
+    if parsed['service_type'] not in SERVICE_TYPES:
+        raise ValueError(f"invalid service_type '{parsed['service_type']}'")
+
+    is_active = _text(row, 'is_active')
+    parsed['is_active'] = is_active.lower() in TRUE_VALUES if is_active else True
+
+    parsed['provider_fields'] = {
+        field: _text(row, column) for column, field in PROVIDER_COLUMNS.items()
+        if _text(row, column)
+    }
+    parsed['category_fields'] = {
+        field: _text(row, column) for column, field in CATEGORY_COLUMNS.items()
+        if _text(row, column)
+    }
+    return parsed
+
+
+class CatalogImporter:
+    """Upsert catalog rows in batches and collect a diff report and stats"""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, deactivate_missing=True):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.deactivate_missing = deactivate_missing
+        self.stats = {
+            'rows': 0,
+            'batches': 0,
+            'providers_created': 0,
+            'categories_created': 0,
+            'services_created': 0,
+            'services_updated': 0,
+            'services_unchanged': 0,
+            'services_deactivated': 0,
+            'errors': 0,
+            'elapsed': 0.0,
+        }
+        self.diff = {'created': [], 'updated': [], 'deactivated': []}
+        self.errors = []
+        self._provider_ids = set()
+        self._seen_services = set()
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.stats['elapsed']
+        return self.stats['rows'] / elapsed if elapsed else 0.0
+
+    def run(self, rows):
+        """Import ``(line_number, row)`` pairs; returns ``self.stats``"""
+        started_at = timezone.now()
+        started = time.monotonic()
+        rows = iter(rows)
+        while True:
+            batch, consumed = [], 0
+            for line_number, raw in islice(rows, self.batch_size):
+                consumed += 1
+                try:
+                    batch.append(parse_row(raw))
+                except ValueError as exc:
+                    self.errors.append(f'Row {line_number}: {exc}')
+            if not consumed:
+                break
+            self.stats['rows'] += consumed
+            self.stats['errors'] = len(self.errors)
+            if batch:
+                stats = dict(self.stats)
+                diff = {key: list(labels) for key, labels in self.diff.items()}
+                try:
+                    self._import_batch(batch)
+                except DatabaseError as exc:
+                    # The failed batch was rolled back; earlier batches stay
+                    self.stats.update(stats)
+                    self.diff = diff
+                    self.errors.append(
+                        f"Batch {self.stats['batches'] + 1} failed and was rolled back: {exc}"
+                    )
+                    self.errors.append('Stopped importing; later rows were not read')
+                    self.stats['errors'] = len(self.errors)
+                    break
+                self.stats['batches'] += 1
+
+        if self.deactivate_missing:
+            if self.errors:
+                # A rejected row must not cause its service to be deactivated
+                self.errors.append('Skipped deactivation because some rows were rejected')
+            else:
+                self._deactivate_missing(started_at)
+        if not self.dry_run:
+            bump_catalog_version()
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    def _merge(self, model, existing, names, fields_by_name, defaults):
+        """Build unsaved instances overlaying file values on existing rows"""
+        objects = []
+        for name in names:
+            current = existing.get(name)
+            values = dict(defaults)
+            if current is not None:
+                values.update({field: getattr(current, field) for field in defaults})
+            values.update(fields_by_name.get(name, {}))
+            objects.append(model(name=name, **values))
+        return objects
+
+    def _upsert_named(self, model, names, fields_by_name, defaults):
+        existing = {obj.name: obj for obj in model.objects.filter(name__in=names)}
+        created = [name for name in names if name not in existing]
+        if not self.dry_run:
+            model.objects.bulk_create(
+                self._merge(model, existing, names, fields_by_name, defaults),
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=list(defaults) + ['updated_at'],
+            )
+            existing = {obj.name: obj for obj in model.objects.filter(name__in=names)}
+        return existing, created
+
+    def _import_batch(self, batch):
+        provider_fields, category_fields = {}, {}
+        for row in batch:
+            provider_fields.setdefault(row['provider'], {}).update(row['provider_fields'])
+            if row['category']:
+                category_fields.setdefault(row['category'], {}).update(row['category_fields'])
+
+        with transaction.atomic():
+            providers, created = self._upsert_named(
+                ServiceProvider, list(provider_fields), provider_fields,
+                {'contact_email': '', 'website': '', 'contact_phone': '', 'description': ''}
+            )
+            self.stats['providers_created'] += len(created)
+            categories, created = self._upsert_named(
+                ServiceCategory, list(category_fields), category_fields,
+                {'icon': '', 'description': ''}
+            )
+            self.stats['categories_created'] += len(created)
+
+            provider_ids = [provider.pk for provider in providers.values()]
+            self._provider_ids.update(provider_ids)
+            existing = {
+                (service.provider_id, service.name): service
+                for service in Service.objects.filter(
+                    provider_id__in=provider_ids,
+                    name__in={row['name'] for row in batch}
+                )
+            }
+
+            services = {}
+            for row in batch:
+                provider = providers.get(row['provider'])
+                category = categories.get(row['category'])
+                values = {
+                    'category_id': category.pk if category else None,
+                    'description': row['description'],
+                    'price': row['price'],
+                    'price_unit': row['price_unit'],
+                    'service_type': row['service_type'],
+                    'is_active': row['is_active'],
+                }
+                label = f"{row['provider']} / {row['name']}"
+                key = (provider.pk if provider else row['provider'], row['name'])
+                self._seen_services.add((row['provider'], row['name']))
+
+                current = existing.get(key)
+                if current is None:
+                    self.stats['services_created'] += 1
+                    self.diff['created'].append(label)
+                elif any(getattr(current, field) != value for field, value in values.items()):
+                    self.stats['services_updated'] += 1
+                    self.diff['updated'].append(label)
+                else:
+                    self.stats['services_unchanged'] += 1
+                if provider is not None:
+                    # Later rows for the same service win
+                    services[key] = Service(provider=provider, name=row['name'], **values)
+
+            if not self.dry_run:
+                Service.objects.bulk_create(
+                    list(services.values()),
+                    update_conflicts=True,
+                    unique_fields=['provider', 'name'],
+                    update_fields=list(SERVICE_FIELDS) + ['updated_at'],
+                )
+
+    def _deactivate_missing(self, started_at):
+        """Deactivate services of imported providers that were not in the file"""
+        missing = Service.objects.filter(
+            provider_id__in=self._provider_ids, is_active=True
+        )
+        if self.dry_run:
+            for provider_name, name in missing.values_list('provider__name', 'name'):
+                if (provider_name, name) not in self._seen_services:
+                    self.diff['deactivated'].append(f'{provider_name} / {name}')
+            self.stats['services_deactivated'] = len(self.diff['deactivated'])
+            return
+
+        # Every upserted row was stamped with updated_at during this run
+        missing = missing.filter(updated_at__lt=started_at)
+        self.diff['deactivated'] = [
+            f'{provider_name} / {name}'
+            for provider_name, name in missing.values_list('provider__name', 'name')
+        ]
+        self.stats['services_deactivated'] = missing.update(
+            is_active=False, updated_at=timezone.now()
+        )
@@ -0,0 +1,185 @@
+"""Negotiated Brotli/gzip compression for API responses.
+
+Only JSON responses under ``COMPRESSION_PATH_PREFIX`` (default ``/api/``)
+are compressed. HTML pages such as the admin embed CSRF tokens next to
+reflected input, which compression would expose to BREACH-style attacks.
+Brotli is used when the optional ``brotli`` package is installed and the
+client accepts it, gzip otherwise. Responses served from a cache can set
+``response.compression_cache_key``; their compressed bytes are then cached
+alongside, keyed by a digest of the rendered content, so repeat hits skip
+recompression. Bytes on the wire and compression CPU time are accumulated
+per endpoint in ``compression_stats``.
+"""
+import gzip
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json',)
+PRECOMPRESSED_TIMEOUT = 300
+UNRESOLVED_ENDPOINT = 'unresolved'
+
+
+def get_min_size():
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def get_path_prefix():
+    return getattr(settings, 'COMPRESSION_PATH_PREFIX', '/api/')
+
+
+def supported_encodings():
+    """Encodings in server preference order"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported encoding allowed by an Accept-Encoding header"""
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+        )
+    # mtime=0 keeps the output deterministic, and therefore cacheable
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def compress_cached(data, encoding, cache_key):
+    """Compress ``data``, reusing bytes cached under ``cache_key`` when present"""
+    digest = hashlib.md5(data).hexdigest()
+    key = f'{cache_key}:{encoding}:{digest}'
+    compressed = cache.get(key)
+    if compressed is not None:
+        return compressed, True
+    compressed = compress(data, encoding)
+    cache.set(key, compressed, PRECOMPRESSED_TIMEOUT)
+    return compressed, False
+
+
+class CompressionStats:
+    """Per-endpoint counters for raw vs. wire bytes and compression CPU time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, encoding, raw_bytes, wire_bytes, cpu_seconds, cache_hit=False):
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                'requests': 0,
+                'compressed': 0,
+                'cache_hits': 0,
+                'raw_bytes': 0,
+                'wire_bytes': 0,
+                'cpu_seconds': 0.0,
+                'encodings': {},
+            })
+            entry['requests'] += 1
+            entry['raw_bytes'] += raw_bytes
+            entry['wire_bytes'] += wire_bytes
+            entry['cpu_seconds'] += cpu_seconds
+            if encoding:
+                entry['compressed'] += 1
+                entry['encodings'][encoding] = entry['encodings'].get(encoding, 0) + 1
+            if cache_hit:
+                entry['cache_hits'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {**entry, 'encodings': dict(entry['encodings'])}
+                for endpoint, entry in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+compression_stats = CompressionStats()
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.view_name:
+        return match.view_name
+    # Unresolved paths share one entry so stats cannot grow per URL
+    return UNRESOLVED_ENDPOINT
+
+
+def compress_response(request, response):
+    """Compress ``response`` in place if the client and content allow it"""
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    if not request.path.startswith(get_path_prefix()):
+        return response
+
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return response
+
+    # The representation depends on Accept-Encoding from here on
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    raw = response.content
+    endpoint = endpoint_name(request)
+    encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None or len(raw) < get_min_size():
+        compression_stats.record(endpoint, None, len(raw), len(raw), 0.0)
+        return response
+
+    started = time.thread_time()
+    cache_key = getattr(response, 'compression_cache_key', None)
+    if cache_key:
+        compressed, cache_hit = compress_cached(raw, encoding, cache_key)
+    else:
+        compressed, cache_hit = compress(raw, encoding), False
+    cpu_seconds = time.thread_time() - started
+
+    compression_stats.record(endpoint, encoding, len(raw), len(compressed), cpu_seconds, cache_hit)
+    if len(compressed) >= len(raw):
+        return response
+
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+    timing = f'compress;dur={cpu_seconds * 1000:.2f}'
+    if response.has_header('Server-Timing'):
+        timing = f"{response['Server-Timing']}, {timing}"
+    response['Server-Timing'] = timing
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
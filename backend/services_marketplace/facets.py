@@ -0,0 +1,137 @@
+"""Facet counts for the services catalog.
+
+All facets are computed from one grouped query over the filtered services
+queryset, then rolled up per facet in Python. Results are cached by the
+normalized query string and the database-backed catalog version, which is
+bumped whenever a service, provider or category changes. Because the
+version lives in the database, a bump from any process invalidates facets
+cached by every worker, even with a per-process cache.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Value, When
+
+from .models import CatalogVersion, Service
+
+# (key, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ('0-50', None, 50),
+    ('50-100', 50, 100),
+    ('100-250', 100, 250),
+    ('250-500', 250, 500),
+    ('500+', 500, None),
+]
+
+FACET_CACHE_TIMEOUT = 300
+CATALOG_VERSION_ID = 1
+
+# Query parameters that do not change which services match
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'format'}
+
+
+def get_catalog_version():
+    version = (
+        CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID)
+        .values_list('version', flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def bump_catalog_version():
+    """Invalidate every cached facet response.
+
+    Queryset ``update()``/``delete()`` calls bypass model signals and must
+    call this explicitly.
+    """
+    updated = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).update(
+        version=F('version') + 1
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                CatalogVersion.objects.create(pk=CATALOG_VERSION_ID, version=1)
+        except IntegrityError:
+            # Created concurrently by another process
+            bump_catalog_version()
+
+
+def normalize_query(query_params):
+    """Return a canonical query string for the parameters that affect matching"""
+    items = sorted(
+        (key, value)
+        for key in query_params
+        if key not in IGNORED_PARAMS
+        for value in sorted(query_params.getlist(key))
+        if value != ''
+    )
+    return urlencode(items)
+
+
+def facet_cache_key(query_params):
+    digest = hashlib.md5(normalize_query(query_params).encode()).hexdigest()
+    return f'services_marketplace:facets:{get_catalog_version()}:{digest}'
+
+
+def _price_bucket():
+    whens = []
+    for key, low, high in PRICE_BUCKETS:
+        bounds = {}
+        if low is not None:
+            bounds['price__gte'] = low
+        if high is not None:
+            bounds['price__lt'] = high
+        whens.append(When(then=Value(key), **bounds))
+    return Case(*whens, output_field=CharField())
+
+
+def service_facets(queryset):
+    """Count services per category, provider, service type and price bucket"""
+    rows = (
+        queryset.order_by()
+        .values(
+            'category_id', 'category__name', 'provider_id', 'provider__name',
+            'service_type', price_bucket=_price_bucket()
+        )
+        .annotate(count=Count('id'))
+    )
+
+    total = 0
+    categories, providers = {}, {}
+    service_types = dict.fromkeys(dict(Service.SERVICE_TYPE_CHOICES), 0)
+    prices = dict.fromkeys((key for key, _, _ in PRICE_BUCKETS), 0)
+    for row in rows:
+        count = row['count']
+        total += count
+        category = categories.setdefault(
+            row['category_id'],
+            {'value': row['category_id'], 'label': row['category__name'], 'count': 0}
+        )
+        category['count'] += count
+        provider = providers.setdefault(
+            row['provider_id'],
+            {'value': row['provider_id'], 'label': row['provider__name'], 'count': 0}
+        )
+        provider['count'] += count
+        service_types[row['service_type']] = service_types.get(row['service_type'], 0) + count
+        prices[row['price_bucket']] += count
+
+    def by_label(facet):
+        return facet['label'] or ''
+
+    type_labels = dict(Service.SERVICE_TYPE_CHOICES)
+    return {
+        'count': total,
+        'category': sorted(categories.values(), key=by_label),
+        'provider': sorted(providers.values(), key=by_label),
+        'service_type': [
+            {'value': value, 'label': type_labels.get(value, value), 'count': count}
+            for value, count in service_types.items()
+        ],
+        'price': [
+            {'value': key, 'min': low, 'max': high, 'count': prices[key]}
+            for key, low, high in PRICE_BUCKETS
+        ],
+    }
@@ -0,0 +1,49 @@
+class LazyDjangoFilterBackend:
+    """DjangoFilterBackend that imports django_filters on first use.
+
+    django_filters pulls in Django forms and its own filter machinery, which
+    a fresh process otherwise pays for while importing the views, before it
+    has served anything. DRF instantiates every filter backend on every list
+    request, so this wrapper only imports and delegates once a request
+    actually passes one of the view's ``filterset_fields``; unfiltered lists
+    are returned unchanged.
+    """
+    _backend_class = None
+
+    @classmethod
+    def get_backend_class(cls):
+        if cls._backend_class is None:
+            from django_filters.rest_framework import DjangoFilterBackend
+            cls._backend_class = DjangoFilterBackend
+        return cls._backend_class
+
+    @property
+    def backend(self):
+        return self.get_backend_class()()
+
+    def get_filter_params(self, view):
+        """Query parameter names handled by the view's ``filterset_fields``"""
+        fields = getattr(view, 'filterset_fields', None) or ()
+        if not isinstance(fields, dict):
+            return set(fields)
+        return {
+            field if lookup == 'exact' else f'{field}__{lookup}'
+            for field, lookups in fields.items()
+            for lookup in lookups
+        }
+
+    def is_filtered(self, request, view):
+        if getattr(view, 'filterset_class', None) is not None:
+            return True
+        return not self.get_filter_params(view).isdisjoint(request.query_params)
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_filtered(request, view):
+            return queryset
+        return self.backend.filter_queryset(request, queryset, view)
+
+    def get_schema_fields(self, view):
+        return self.backend.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.backend.get_schema_operation_parameters(view)
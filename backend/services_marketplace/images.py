@@ -0,0 +1,116 @@
+"""Responsive variants for provider logos.
+
+Resized WebP and PNG copies of each uploaded logo are generated off the
+request path and stored under content-hash filenames, so they can be served
+with far-future immutable cache headers. ``ServiceProvider.logo_variants``
+records the source file they were built from and the stored names::
+
+    {"source": "provider_logos/acme.png",
+     "sizes": {"40": {"webp": "...", "png": "..."}, ...}}
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+
+from .models import ServiceProvider
+
+logger = logging.getLogger(__name__)
+
+LOGO_VARIANT_WIDTHS = (40, 80, 160, 320)
+LOGO_VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 85, 'method': 6},
+    'png': {'format': 'PNG', 'optimize': True},
+}
+LOGO_VARIANT_DIR = 'provider_logos/variants'
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'SERVICES_LOGO_WORKERS', 2),
+            thread_name_prefix='logo-variants'
+        )
+    return _executor
+
+
+def build_logo_variants(logo):
+    """Resize ``logo`` to the variant widths; returns the ``sizes`` mapping"""
+    from PIL import Image
+
+    with logo.open('rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+
+    image = Image.open(BytesIO(data))
+    image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    # Never upscale: widths beyond the original collapse to the original
+    # width, and every variant is keyed by the width it really has
+    widths = sorted({min(width, image.width) for width in LOGO_VARIANT_WIDTHS})
+
+    sizes = {}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+
+        sizes[str(width)] = {}
+        for extension, options in LOGO_VARIANT_FORMATS.items():
+            name = f'{LOGO_VARIANT_DIR}/{digest}-{width}w.{extension}'
+            if not default_storage.exists(name):
+                buffer = BytesIO()
+                resized.save(buffer, **options)
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            sizes[str(width)][extension] = name
+    return sizes
+
+
+def regenerate_logo_variants(provider_id, force=False):
+    """Rebuild variants for one provider; returns True if anything was written"""
+    provider = ServiceProvider.objects.filter(pk=provider_id).first()
+    if provider is None:
+        return False
+
+    source = provider.logo.name or ''
+    if not force and provider.logo_variants.get('source', '') == source:
+        return False
+    variants = {}
+    if source:
+        variants = {'source': source, 'sizes': build_logo_variants(provider.logo)}
+
+    # update() skips signals, and the logo filter discards the result if the
+    # logo was replaced while the variants were being built
+    providers = ServiceProvider.objects.filter(pk=provider_id)
+    if source:
+        providers = providers.filter(logo=source)
+    else:
+        providers = providers.filter(Q(logo='') | Q(logo__isnull=True))
+    return bool(providers.update(logo_variants=variants))
+
+
+def _run_in_worker(provider_id):
+    try:
+        regenerate_logo_variants(provider_id)
+    except Exception:
+        logger.exception('Failed to build logo variants for provider %s', provider_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_logo_variants(provider_id):
+    """Build variants in the background once the current transaction commits"""
+    if getattr(settings, 'SERVICES_LOGO_VARIANTS_SYNC', False):
+        transaction.on_commit(lambda: regenerate_logo_variants(provider_id))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, provider_id))
@@ -0,0 +1,56 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services_marketplace.archive import (
+    DEFAULT_BATCH_SIZE, archivable_bookings, archive_bookings, get_archive_horizon
+)
+
+
+class Command(BaseCommand):
+    help = 'Move old completed/cancelled bookings and their reviews into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before', type=str,
+            help='Archive bookings starting before this date (YYYY-MM-DD); '
+                 'defaults to SERVICES_ARCHIVE_AFTER_DAYS ago'
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many bookings would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                before = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format')
+        else:
+            before = get_archive_horizon()
+
+        if options['dry_run']:
+            count = archivable_bookings(before).count()
+            self.stdout.write(f'{count} bookings starting before {before} would be archived')
+            return
+
+        started = time.monotonic()
+        total_bookings = total_reviews = 0
+        for bookings, reviews in archive_bookings(
+            before, options['batch_size'], options['max_batches']
+        ):
+            total_bookings += bookings
+            total_reviews += reviews
+            self.stdout.write(f'Archived {bookings} bookings, {reviews} reviews')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Archived {total_bookings} bookings and {total_reviews} reviews '
+                f'starting before {before} in {elapsed:.2f}s'
+            )
+        )
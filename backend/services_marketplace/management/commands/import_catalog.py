@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services_marketplace.catalog_import import (
+    CATALOG_FORMATS, DEFAULT_BATCH_SIZE, CatalogImportError, CatalogImporter,
+    detect_format, read_catalog
+)
+
+
+class Command(BaseCommand):
+    help = 'Upsert providers, categories and services from a CSV/JSON catalog file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file (.csv, .json or .jsonl)')
+        parser.add_argument('--format', choices=CATALOG_FORMATS, help='Override format detection')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would change without writing anything'
+        )
+        parser.add_argument(
+            '--keep-missing', action='store_true',
+            help="Do not deactivate the providers' services that are missing from the file"
+        )
+
+    def handle(self, *args, **options):
+        importer = CatalogImporter(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            deactivate_missing=not options['keep_missing'],
+        )
+        try:
+            fmt = options['format'] or detect_format(options['path'])
+            with open(options['path'], 'rb') as catalog:
+                stats = importer.run(read_catalog(catalog, fmt))
+        except (OSError, CatalogImportError) as exc:
+            raise CommandError(str(exc))
+
+        if options['dry_run']:
+            for change, labels in importer.diff.items():
+                for label in labels:
+                    self.stdout.write(f'{change:>11}: {label}')
+        for error in importer.errors:
+            self.stderr.write(error)
+
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{stats['rows']} rows in {stats['batches']} batches, "
+                f"{stats['services_created']} services created, "
+                f"{stats['services_updated']} updated, "
+                f"{stats['services_unchanged']} unchanged, "
+                f"{stats['services_deactivated']} deactivated, "
+                f"{stats['providers_created']} providers and "
+                f"{stats['categories_created']} categories created, "
+                f"{stats['errors']} errors "
+                f"({stats['elapsed']:.2f}s, {importer.rows_per_second:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,66 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+
+from services_marketplace.compression import compression_stats, supported_encodings
+from services_marketplace.urls import router
+
+User = get_user_model()
+
+EXTRA_PATHS = [
+    '/api/services/services/facets/',
+    '/api/services/services/recommended/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes on the wire and compression CPU cost per API endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username to authenticate as')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per endpoint and encoding')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        paths = [f'/api/services/{prefix}/' for prefix, _, _ in router.registry] + EXTRA_PATHS
+        # The test client's default 'testserver' host is rarely in ALLOWED_HOSTS
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host and not host.startswith(('*', '.'))),
+            'localhost',
+        )
+        client = APIClient(HTTP_HOST=host, SERVER_NAME=host)
+        # Authenticates in-process, so no token or session is stored for the user
+        client.force_authenticate(user)
+
+        self.stdout.write(
+            f"{'endpoint':<44} {'encoding':<9} {'raw':>9} {'wire':>9} {'ratio':>6} "
+            f"{'cpu ms':>8} {'hits':>5} {'total ms':>9}"
+        )
+        for path in paths:
+            for encoding in ('identity',) + supported_encodings():
+                compression_stats.reset()
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+                elapsed = (time.perf_counter() - started) / options['repeat']
+                if response.status_code != 200:
+                    self.stderr.write(f'{path}: HTTP {response.status_code}')
+                    break
+
+                for endpoint, entry in compression_stats.snapshot().items():
+                    requests = entry['requests']
+                    raw = entry['raw_bytes'] / requests
+                    wire = entry['wire_bytes'] / requests
+                    self.stdout.write(
+                        f"{endpoint:<44} {encoding:<9} {raw:>9.0f} {wire:>9.0f} "
+                        f"{wire / raw if raw else 1:>6.2f} "
+                        f"{entry['cpu_seconds'] / requests * 1000:>8.2f} "
+                        f"{entry['cache_hits']:>5} {elapsed * 1000:>9.2f}"
+                    )
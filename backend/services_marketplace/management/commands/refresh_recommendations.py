@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services_marketplace.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Precompute "recommended for you" service candidates for users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only refresh the given user id (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = refresh_recommendations(options['user_ids'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote {written} recommendations in {elapsed:.2f}s'
+            )
+        )
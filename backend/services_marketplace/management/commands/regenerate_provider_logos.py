@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services_marketplace.images import regenerate_logo_variants
+from services_marketplace.models import ServiceProvider
+
+
+class Command(BaseCommand):
+    help = 'Build resized logo variants for existing service providers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild variants even if they are already up to date'
+        )
+        parser.add_argument(
+            '--provider', type=int, action='append', dest='provider_ids',
+            help='Only regenerate the given provider id (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        providers = ServiceProvider.objects.exclude(logo='').exclude(logo__isnull=True)
+        if options['provider_ids']:
+            providers = providers.filter(pk__in=options['provider_ids'])
+
+        started = time.monotonic()
+        updated = failed = 0
+        for provider_id in providers.values_list('pk', flat=True).iterator():
+            try:
+                if regenerate_logo_variants(provider_id, force=options['force']):
+                    updated += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'Provider {provider_id}: {exc}')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Regenerated logo variants for {updated} providers '
+                f'({failed} failed) in {elapsed:.2f}s'
+            )
+        )
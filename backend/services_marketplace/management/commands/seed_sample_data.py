@@ -4,7 +4,6 @@ from services_marketplace.models import (
     ServiceCategory, ServiceProvider, Service, 
     ServiceBooking, ServiceReview, SavedService
 )
-from faker import Faker
 import random
 from datetime import datetime, timedelta
 
@@ -14,6 +13,9 @@ class Command(BaseCommand):
     help = 'Populate the database with sample data for testing'
 
     def handle(self, *args, **options):
+        # Imported here so loading management commands does not pay for faker
+        from faker import Faker
+
         self.stdout.write('Creating sample data...')
         fake = Faker()
         
@@ -0,0 +1,95 @@
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .compression import compress_response
+
+DEFAULT_LOW_PRIORITY_PATHS = [
+    r'/exports?(/|$)',
+    r'/analytics(/|$)',
+    r'^/api/services/services/facets/',
+]
+
+
+class LoadSheddingMiddleware:
+    """Shed low-priority requests with 503 + Retry-After when this worker is slow.
+
+    Latency is tracked as an exponentially weighted moving average of recent
+    request durations, decayed towards zero while the worker is idle. When
+    it crosses ``LOAD_SHEDDING_LATENCY_THRESHOLD`` seconds, or when more than
+    ``LOAD_SHEDDING_MAX_IN_FLIGHT`` requests are running, requests matching
+    ``LOAD_SHEDDING_LOW_PRIORITY_PATHS`` are rejected so bookings and other
+    interactive calls keep the worker's capacity.
+    """
+    smoothing = 0.2
+    decay_seconds = 10.0
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.latency_threshold = getattr(settings, 'LOAD_SHEDDING_LATENCY_THRESHOLD', 1.0)
+        self.max_in_flight = getattr(settings, 'LOAD_SHEDDING_MAX_IN_FLIGHT', None)
+        self.retry_after = getattr(settings, 'LOAD_SHEDDING_RETRY_AFTER', 5)
+        self.low_priority_paths = [
+            re.compile(pattern)
+            for pattern in getattr(
+                settings, 'LOAD_SHEDDING_LOW_PRIORITY_PATHS', DEFAULT_LOW_PRIORITY_PATHS
+            )
+        ]
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = 0.0
+        self._updated = time.monotonic()
+
+    def is_low_priority(self, request):
+        return any(pattern.search(request.path) for pattern in self.low_priority_paths)
+
+    def current_latency(self):
+        idle = time.monotonic() - self._updated
+        return self._latency * math.exp(-idle / self.decay_seconds)
+
+    def is_overloaded(self):
+        if self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+            return True
+        return self.current_latency() > self.latency_threshold
+
+    def __call__(self, request):
+        if self.is_low_priority(request) and self.is_overloaded():
+            response = JsonResponse(
+                {'detail': 'Server is busy, please retry later.'}, status=503
+            )
+            response['Retry-After'] = str(self.retry_after)
+            return response
+
+        with self._lock:
+            self._in_flight += 1
+        started = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._in_flight -= 1
+                self._latency = (
+                    self.smoothing * (finished - started)
+                    + (1 - self.smoothing) * self.current_latency()
+                )
+                self._updated = finished
+
+
+class CompressionMiddleware:
+    """Compress responses with Brotli or gzip, negotiated from Accept-Encoding.
+
+    Must sit above any middleware that reads or modifies the response body.
+    See ``services_marketplace.compression`` for thresholds, precompressed
+    cache reuse and per-endpoint measurements.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return compress_response(request, self.get_response(request))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services_marketplace', '0002_service_recommendation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedServiceBooking',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Original ServiceBooking id', primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedServiceReview',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Original ServiceReview id', primary_key=True, serialize=False)),
+                ('rating', models.PositiveSmallIntegerField(choices=[(1, '1 - Poor'), (2, '2 - Fair'), (3, '3 - Good'), (4, '4 - Very Good'), (5, '5 - Excellent')])),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='servicebooking',
+            index=models.Index(fields=['status', 'start_date'], name='svc_booking_status_start_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedservicebooking',
+            name='service',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_bookings', to='services_marketplace.service'),
+        ),
+        migrations.AddField(
+            model_name='archivedservicebooking',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_service_bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedservicereview',
+            name='booking',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='review', to='services_marketplace.archivedservicebooking'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedservicebooking',
+            index=models.Index(fields=['user', 'start_date'], name='svc_archbooking_user_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services_marketplace', '0003_booking_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicebooking',
+            index=models.Index(fields=['start_date'], name='svc_booking_start_idx'),
+        ),
+    ]
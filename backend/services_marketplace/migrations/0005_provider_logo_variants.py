@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services_marketplace', '0004_booking_start_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized logo variants, maintained by the image pipeline'),
+        ),
+    ]
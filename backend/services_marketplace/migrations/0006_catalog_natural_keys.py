@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services_marketplace', '0005_provider_logo_variants'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='service',
+            constraint=models.UniqueConstraint(fields=('provider', 'name'), name='unique_service_per_provider'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicecategory',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_service_category_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='serviceprovider',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_service_provider_name'),
+        ),
+    ]
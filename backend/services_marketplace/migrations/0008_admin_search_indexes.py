@@ -0,0 +1,53 @@
+"""Case-insensitive indexes for the large-table admin searches.
+
+``^service__name`` compiles to ``UPPER(name::text) LIKE UPPER('x%')`` on
+PostgreSQL and to ``name LIKE 'x%'`` on SQLite; ``user__email__iexact``
+compiles to the equality form of the same expressions. Neither column has an
+index those queries can use, and such indexes cannot be declared portably in
+``Meta.indexes`` (PostgreSQL needs a pattern opclass, SQLite a collation), so
+they are created here per database vendor. Other vendors are skipped.
+"""
+from django.conf import settings
+from django.db import migrations
+
+INDEX_EXPRESSIONS = {
+    'postgresql': 'UPPER(%s::text) text_pattern_ops',
+    'sqlite': '%s COLLATE NOCASE',
+}
+
+INDEXES = [
+    ('svc_service_name_ci_idx', ('services_marketplace', 'Service'), 'name'),
+    ('svc_user_email_ci_idx', tuple(settings.AUTH_USER_MODEL.split('.')), 'email'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    expression = INDEX_EXPRESSIONS.get(schema_editor.connection.vendor)
+    if expression is None:
+        return
+    quote = schema_editor.quote_name
+    for name, model, column in INDEXES:
+        table = apps.get_model(*model)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} '
+            f'({expression % quote(column)})'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor not in INDEX_EXPRESSIONS:
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services_marketplace', '0007_catalog_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
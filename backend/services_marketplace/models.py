@@ -15,6 +15,9 @@ class ServiceCategory(models.Model):
     class Meta:
         verbose_name_plural = "Service Categories"
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_service_category_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -25,6 +28,10 @@ class ServiceProvider(models.Model):
     description = models.TextField(blank=True)
     website = models.URLField(blank=True)
     logo = models.ImageField(upload_to='provider_logos/', blank=True, null=True)
+    logo_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Resized logo variants, maintained by the image pipeline"
+    )
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=20, blank=True)
     is_active = models.BooleanField(default=True)
@@ -33,6 +40,9 @@ class ServiceProvider(models.Model):
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_service_provider_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -57,6 +67,11 @@ class Service(models.Model):
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'name'], name='unique_service_per_provider'),
+        ]
+        # Admin name prefix search uses a case-insensitive index on name that
+        # needs vendor-specific SQL; see migration 0008_admin_search_indexes
 
     def __str__(self):
         return f"{self.name} by {self.provider.name}"
@@ -80,8 +95,14 @@ class ServiceBooking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    is_archived = False
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'start_date'], name='svc_booking_status_start_idx'),
+            models.Index(fields=['start_date'], name='svc_booking_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s booking for {self.service.name}"
@@ -102,6 +123,8 @@ class ServiceReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    is_archived = False
+
     class Meta:
         ordering = ['-created_at']
 
@@ -120,3 +143,75 @@ class SavedService(models.Model):
 
     def __str__(self):
         return f"{self.user.email} saved {self.service.name}"
+
+class CatalogVersion(models.Model):
+    """Single-row counter bumped on every catalog change.
+
+    Cached catalog data (facet counts) is keyed by this version, so keeping
+    it in the database invalidates caches in every worker and process even
+    when the cache itself is per-process.
+    """
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+class ServiceRecommendation(models.Model):
+    """Precomputed "recommended for you" candidates, ranked per user"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='service_recommendations')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='recommended_to')
+    score = models.FloatField()
+    rank = models.PositiveIntegerField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ['user', 'service']
+        ordering = ['user', 'rank']
+        indexes = [
+            models.Index(fields=['user', 'rank'], name='svc_rec_user_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.service.name} for {self.user.email}"
+
+class ArchivedServiceBooking(models.Model):
+    """Completed or cancelled bookings moved out of ServiceBooking by the archiver"""
+    id = models.BigIntegerField(primary_key=True, help_text="Original ServiceBooking id")
+    service = models.ForeignKey(Service, on_delete=models.PROTECT, related_name='archived_bookings')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_service_bookings')
+    status = models.CharField(max_length=20, choices=ServiceBooking.STATUS_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'start_date'], name='svc_archbooking_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email}'s archived booking for {self.service.name}"
+
+class ArchivedServiceReview(models.Model):
+    """Reviews archived together with their booking"""
+    id = models.BigIntegerField(primary_key=True, help_text="Original ServiceReview id")
+    booking = models.OneToOneField(ArchivedServiceBooking, on_delete=models.CASCADE, related_name='review')
+    rating = models.PositiveSmallIntegerField(choices=ServiceReview.RATING_CHOICES)
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.booking.user.email}'s archived review for {self.booking.service.name}"
@@ -0,0 +1,283 @@
+"""Precomputed "recommended for you" candidates.
+
+Scores come from a sparse user x service interaction matrix built from
+bookings, saved services and review ratings, archived ones included. Users are compared by cosine
+similarity over their interaction rows, and each candidate service is scored
+by the similarity-weighted interactions of neighbouring users plus a small
+popularity prior. Results are stored in ``ServiceRecommendation`` so the
+request path is a single indexed read.
+"""
+import heapq
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import (
+    Service, ServiceBooking, ServiceReview, SavedService, ServiceRecommendation,
+    ArchivedServiceBooking, ArchivedServiceReview
+)
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Interaction weights
+BOOKING_WEIGHT = 3.0
+SAVED_WEIGHT = 2.0
+REVIEW_WEIGHT = 1.0  # applied per rating point above/below a neutral 3
+POPULARITY_WEIGHT = 0.1
+
+USER_CHUNK_SIZE = 500
+
+POPULARITY_CACHE_KEY = 'services_marketplace:service_popularity'
+POPULARITY_CACHE_TIMEOUT = 600
+
+_executor = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_recommendation_limit():
+    return getattr(settings, 'SERVICES_RECOMMENDATION_LIMIT', 20)
+
+
+def build_interaction_matrix(user_ids=None):
+    """Return a sparse ``{user_id: {service_id: weight}}`` interaction matrix.
+
+    Archived bookings and reviews count like live ones, so a user's history
+    keeps shaping their recommendations after ``archive_bookings`` runs.
+    """
+    booking_sources = [
+        ServiceBooking.objects.exclude(status='cancelled'),
+        ArchivedServiceBooking.objects.exclude(status='cancelled'),
+    ]
+    review_sources = [ServiceReview.objects.all(), ArchivedServiceReview.objects.all()]
+    saved = SavedService.objects.all()
+    if user_ids is not None:
+        booking_sources = [bookings.filter(user_id__in=user_ids) for bookings in booking_sources]
+        review_sources = [
+            reviews.filter(booking__user_id__in=user_ids) for reviews in review_sources
+        ]
+        saved = saved.filter(user_id__in=user_ids)
+
+    booking_counts = Counter()
+    for bookings in booking_sources:
+        rows = (
+            bookings.order_by()
+            .values('user_id', 'service_id')
+            .annotate(n=Count('id'))
+            .values_list('user_id', 'service_id', 'n')
+        )
+        for user_id, service_id, n in rows:
+            booking_counts[user_id, service_id] += n
+
+    matrix = defaultdict(lambda: defaultdict(float))
+    for (user_id, service_id), n in booking_counts.items():
+        # Repeat bookings count, with diminishing returns
+        matrix[user_id][service_id] += BOOKING_WEIGHT * (1 + math.log(n))
+    for user_id, service_id in saved.order_by().values_list('user_id', 'service_id'):
+        matrix[user_id][service_id] += SAVED_WEIGHT
+    for reviews in review_sources:
+        review_rows = reviews.order_by().values_list(
+            'booking__user_id', 'booking__service_id', 'rating'
+        )
+        for user_id, service_id, rating in review_rows:
+            matrix[user_id][service_id] += REVIEW_WEIGHT * (rating - 3)
+    return matrix
+
+
+def service_popularity(refresh=False):
+    """Return ``{service_id: score}`` in [0, 1] for active services.
+
+    The prior changes slowly, so incremental refreshes reuse a cached copy;
+    the batch job recomputes it with ``refresh=True``.
+    """
+    if not refresh:
+        popularity = cache.get(POPULARITY_CACHE_KEY)
+        if popularity is not None:
+            return popularity
+
+    counts = dict(
+        Service.objects.filter(is_active=True)
+        .order_by()
+        .annotate(n=Count('bookings'))
+        .values_list('id', 'n')
+    )
+    archived_counts = (
+        ArchivedServiceBooking.objects.filter(service_id__in=counts)
+        .order_by()
+        .values('service_id')
+        .annotate(n=Count('id'))
+        .values_list('service_id', 'n')
+    )
+    for service_id, n in archived_counts:
+        counts[service_id] += n
+    top = max(counts.values(), default=0) or 1
+    popularity = {service_id: n / top for service_id, n in counts.items()}
+    cache.set(POPULARITY_CACHE_KEY, popularity, POPULARITY_CACHE_TIMEOUT)
+    return popularity
+
+
+def index_matrix(matrix):
+    """Return ``(norms, by_service)`` for ``matrix``.
+
+    ``by_service`` is the column view of the matrix, so similarity only
+    touches overlapping users. Build it once and reuse it across chunks.
+    """
+    norms = {
+        user_id: math.sqrt(sum(w * w for w in row.values()))
+        for user_id, row in matrix.items()
+    }
+    by_service = defaultdict(list)
+    for user_id, row in matrix.items():
+        for service_id, weight in row.items():
+            by_service[service_id].append((user_id, weight))
+    return norms, by_service
+
+
+def score_users(matrix, user_ids, popularity, limit=None, index=None):
+    """Rank candidate services for each user in ``user_ids``.
+
+    ``popularity`` doubles as the set of candidate (active) services. Services
+    the user has already interacted with are never recommended back.
+    ``index`` is the result of ``index_matrix(matrix)``, built if omitted.
+    Returns ``{user_id: [(service_id, score), ...]}`` ordered best first.
+    """
+    limit = limit or get_recommendation_limit()
+    norms, by_service = index or index_matrix(matrix)
+
+    results = {}
+    for user_id in user_ids:
+        row = matrix.get(user_id, {})
+        dots = defaultdict(float)
+        for service_id, weight in row.items():
+            for other_id, other_weight in by_service.get(service_id, ()):
+                if other_id != user_id:
+                    dots[other_id] += weight * other_weight
+
+        scores = defaultdict(float)
+        for other_id, dot in dots.items():
+            if dot <= 0 or not norms[other_id]:
+                continue
+            similarity = dot / (norms[user_id] * norms[other_id])
+            for service_id, weight in matrix[other_id].items():
+                if weight > 0:
+                    scores[service_id] += similarity * weight
+        for service_id, pop in popularity.items():
+            scores[service_id] += POPULARITY_WEIGHT * pop
+
+        candidates = (
+            (service_id, score) for service_id, score in scores.items()
+            if service_id in popularity and service_id not in row
+        )
+        results[user_id] = heapq.nlargest(limit, candidates, key=lambda item: item[1])
+    return results
+
+
+def _store(ranked):
+    now = timezone.now()
+    # Users may have been deleted since their refresh was scheduled
+    existing_ids = set(
+        User.objects.filter(pk__in=list(ranked)).values_list('pk', flat=True)
+    )
+    rows = [
+        ServiceRecommendation(
+            user_id=user_id, service_id=service_id,
+            score=score, rank=rank, computed_at=now
+        )
+        for user_id, candidates in ranked.items()
+        if user_id in existing_ids
+        for rank, (service_id, score) in enumerate(candidates, start=1)
+    ]
+    with transaction.atomic():
+        ServiceRecommendation.objects.filter(user_id__in=list(ranked)).delete()
+        ServiceRecommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_recommendations(user_ids=None):
+    """Recompute candidate lists for ``user_ids`` (all active users by default).
+
+    Returns the number of recommendation rows written.
+    """
+    matrix = build_interaction_matrix()
+    popularity = service_popularity(refresh=True)
+    if user_ids is None:
+        user_ids = User.objects.filter(is_active=True).values_list('id', flat=True)
+    user_ids = list(user_ids)
+    index = index_matrix(matrix)
+
+    written = 0
+    for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+        chunk = user_ids[start:start + USER_CHUNK_SIZE]
+        written += _store(score_users(matrix, chunk, popularity, index=index))
+    return written
+
+
+def refresh_user_recommendations(user_id):
+    """Incrementally recompute one user's candidates.
+
+    Only the user and their neighbours (users sharing at least one service)
+    are loaded into the matrix, which yields the same similarities as a full
+    refresh for this user.
+    """
+    own_services = set(build_interaction_matrix([user_id]).get(user_id, {}))
+    neighbour_ids = set(
+        SavedService.objects.filter(service_id__in=own_services)
+        .values_list('user_id', flat=True)
+    )
+    for bookings in (ServiceBooking.objects, ArchivedServiceBooking.objects):
+        neighbour_ids.update(
+            bookings.filter(service_id__in=own_services)
+            .exclude(status='cancelled')
+            .values_list('user_id', flat=True)
+        )
+    neighbour_ids.add(user_id)
+    matrix = build_interaction_matrix(neighbour_ids)
+    return _store(score_users(matrix, [user_id], service_popularity()))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'SERVICES_RECOMMENDATION_WORKERS', 1),
+            thread_name_prefix='recommendations'
+        )
+    return _executor
+
+
+def _run_in_worker(user_id):
+    # Changes made while this refresh runs schedule another one
+    with _pending_lock:
+        _pending.discard(user_id)
+    try:
+        refresh_user_recommendations(user_id)
+    except Exception:
+        logger.exception('Failed to refresh recommendations for user %s', user_id)
+    finally:
+        close_old_connections()
+
+
+def _submit(user_id):
+    with _pending_lock:
+        if user_id in _pending:
+            return
+        _pending.add(user_id)
+    _get_executor().submit(_run_in_worker, user_id)
+
+
+def schedule_user_refresh(user_id):
+    """Refresh one user's candidates in the background once the transaction commits.
+
+    Refreshes already queued for the same user are coalesced.
+    """
+    transaction.on_commit(lambda: _submit(user_id))
@@ -14,14 +14,34 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 class ServiceProviderSerializer(serializers.ModelSerializer):
+    logo_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = ServiceProvider
         fields = [
-            'id', 'name', 'description', 'website', 'logo', 
+            'id', 'name', 'description', 'website', 'logo', 'logo_srcset',
             'contact_email', 'contact_phone', 'is_active', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
+    def get_logo_srcset(self, obj):
+        """Map of width -> format -> URL for the resized logo variants"""
+        # Variants of a replaced logo are stale until the worker rebuilds them
+        if not obj.logo or obj.logo_variants.get('source') != obj.logo.name:
+            return {}
+        sizes = obj.logo_variants.get('sizes', {})
+        if not sizes:
+            return {}
+        storage = obj.logo.storage
+        request = self.context.get('request')
+        srcset = {}
+        for width, formats in sizes.items():
+            srcset[width] = {}
+            for extension, name in formats.items():
+                url = storage.url(name)
+                srcset[width][extension] = request.build_absolute_uri(url) if request else url
+        return srcset
+
 class ServiceSerializer(serializers.ModelSerializer):
     provider = ServiceProviderSerializer(read_only=True)
     category = ServiceCategorySerializer(read_only=True)
@@ -49,12 +69,13 @@ class ServiceBookingSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
+    is_archived = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = ServiceBooking
         fields = [
             'id', 'service', 'service_id', 'user', 'status', 
-            'start_date', 'end_date', 'notes', 'created_at'
+            'start_date', 'end_date', 'notes', 'is_archived', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'status']
 
@@ -68,12 +89,13 @@ class ServiceBookingSerializer(serializers.ModelSerializer):
 class ServiceReviewSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(source='booking.user.email', read_only=True)
     service_name = serializers.StringRelatedField(source='booking.service.name', read_only=True)
+    is_archived = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = ServiceReview
         fields = [
             'id', 'booking', 'user', 'service_name', 'rating', 
-            'comment', 'created_at'
+            'comment', 'is_archived', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
@@ -105,3 +127,19 @@ class SavedServiceSerializer(serializers.ModelSerializer):
         )
         
         return saved_service
+
+class BatchSubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET'], default='GET')
+    path = serializers.CharField(max_length=2000)
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = BatchSubRequestSerializer(many=True, allow_empty=False)
+    concurrent = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        max_requests = self.context.get('max_requests')
+        if max_requests and len(value) > max_requests:
+            raise serializers.ValidationError(
+                f"A batch may contain at most {max_requests} requests"
+            )
+        return value
@@ -0,0 +1,87 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .facets import bump_catalog_version
+from .models import (
+    ServiceCategory, ServiceProvider, Service,
+    ServiceBooking, ServiceReview, SavedService
+)
+
+User = get_user_model()
+
+_state = threading.local()
+
+
+@contextmanager
+def suppress_recommendation_refresh():
+    """Skip incremental recommendation refreshes for bulk maintenance work"""
+    previous = getattr(_state, 'suppressed', False)
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = previous
+
+
+def _recommendation_refresh_enabled():
+    return (
+        getattr(settings, 'SERVICES_RECOMMENDATION_INCREMENTAL', True)
+        and not getattr(_state, 'suppressed', False)
+    )
+
+
+def _deleted_with_user(origin):
+    """True when a post_delete was cascaded from deleting a User"""
+    model = getattr(origin, 'model', None) or type(origin)
+    return isinstance(model, type) and issubclass(model, User)
+
+
+def _schedule_recommendation_refresh(user_id):
+    if not _recommendation_refresh_enabled():
+        return
+    from .recommendations import schedule_user_refresh
+    schedule_user_refresh(user_id)
+
+
+@receiver([post_save, post_delete], sender=ServiceBooking)
+@receiver([post_save, post_delete], sender=SavedService)
+def refresh_recommendations_for_user(sender, instance, origin=None, **kwargs):
+    """Keep a user's recommended services in sync with their bookings and saves"""
+    if _deleted_with_user(origin):
+        return
+    _schedule_recommendation_refresh(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=ServiceReview)
+def refresh_recommendations_for_reviewer(sender, instance, origin=None, **kwargs):
+    if not _recommendation_refresh_enabled() or _deleted_with_user(origin):
+        return
+    try:
+        booking = instance.booking
+    except ServiceBooking.DoesNotExist:
+        # Deleted along with its booking, whose own signal covers the refresh
+        return
+    _schedule_recommendation_refresh(booking.user_id)
+
+
+@receiver([post_save, post_delete], sender=ServiceCategory)
+@receiver([post_save, post_delete], sender=ServiceProvider)
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_catalog_caches(sender, **kwargs):
+    """Any catalog change invalidates cached facet counts"""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=ServiceProvider)
+def refresh_logo_variants(sender, instance, raw=False, **kwargs):
+    """Regenerate resized logos whenever the uploaded logo changes"""
+    if raw:
+        return
+    if instance.logo_variants.get('source', '') != (instance.logo.name or ''):
+        from .images import schedule_logo_variants
+        schedule_logo_variants(instance.pk)
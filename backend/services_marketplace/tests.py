@@ -0,0 +1,242 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from services_marketplace.archive import archive_batch, merge_history
+from services_marketplace.catalog_import import CatalogImporter
+from services_marketplace.models import (
+    ServiceProvider, Service, ServiceBooking, ServiceReview, SavedService,
+    ServiceRecommendation, ArchivedServiceBooking, ArchivedServiceReview
+)
+from services_marketplace.recommendations import refresh_user_recommendations
+from services_marketplace.throttling import BucketStore
+
+User = get_user_model()
+
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+
+def make_service(provider, name, price='10.00', **kwargs):
+    return Service.objects.create(
+        provider=provider, name=name, description='', price=Decimal(price),
+        price_unit='per hour', **kwargs
+    )
+
+
+class MarketplaceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.provider = ServiceProvider.objects.create(name='Acme', contact_email='acme@example.com')
+        cls.service = make_service(cls.provider, 'Audio')
+
+    def book(self, user=None, service=None, status='completed', start_date=date(2000, 1, 1)):
+        return ServiceBooking.objects.create(
+            user=user or self.user, service=service or self.service,
+            status=status, start_date=start_date
+        )
+
+
+class MergedHistoryTests(MarketplaceTestCase):
+    def setUp(self):
+        base = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        # Live bookings at even hours, archived ones at odd hours
+        for hour in (0, 2, 4):
+            booking = self.book()
+            ServiceBooking.objects.filter(pk=booking.pk).update(created_at=base + timedelta(hours=hour))
+        for pk, hour in ((1001, 1), (1003, 3)):
+            ArchivedServiceBooking.objects.create(
+                id=pk, user=self.user, service=self.service, status='completed',
+                start_date=date(2000, 1, 1), created_at=base + timedelta(hours=hour),
+                updated_at=base + timedelta(hours=hour),
+            )
+        self.history = merge_history(
+            [
+                ServiceBooking.objects.filter(user=self.user),
+                ArchivedServiceBooking.objects.filter(user=self.user),
+            ],
+            ['-created_at'],
+        )
+        self.expected = sorted(
+            list(ServiceBooking.objects.all()) + list(ArchivedServiceBooking.objects.all()),
+            key=lambda row: row.created_at, reverse=True
+        )
+
+    def test_count_spans_live_and_archived(self):
+        self.assertEqual(self.history.count(), 5)
+        self.assertEqual(len(self.history), 5)
+
+    def test_slices_follow_merged_ordering(self):
+        self.assertEqual(list(self.history), self.expected)
+        self.assertEqual(self.history[1:4], self.expected[1:4])
+        self.assertEqual(self.history[3:], self.expected[3:])
+        self.assertEqual(self.history[4], self.expected[4])
+        self.assertEqual(self.history[5:10], [])
+        self.assertEqual(
+            [row.is_archived for row in self.history[:2]], [False, True]
+        )
+
+
+class ArchiveBatchTests(MarketplaceTestCase):
+    def test_moves_old_finished_bookings_with_reviews(self):
+        old = self.book()
+        ServiceReview.objects.create(booking=old, rating=5)
+        pending = self.book(status='pending')
+        recent = self.book(start_date=date(2030, 1, 1))
+
+        self.assertEqual(archive_batch(before=date(2001, 1, 1)), (1, 1))
+        self.assertFalse(ServiceBooking.objects.filter(pk=old.pk).exists())
+        self.assertTrue(ArchivedServiceReview.objects.filter(booking_id=old.pk).exists())
+        self.assertQuerySetEqual(
+            ServiceBooking.objects.order_by('pk'), [pending, recent]
+        )
+
+    def test_rerun_is_safe(self):
+        self.book()
+        self.assertEqual(archive_batch(before=date(2001, 1, 1)), (1, 0))
+        self.assertEqual(archive_batch(before=date(2001, 1, 1)), (0, 0))
+        self.assertEqual(ArchivedServiceBooking.objects.count(), 1)
+
+    def test_resumes_after_rows_were_copied_but_not_deleted(self):
+        booking = self.book()
+        # An interrupted run left the archive copy behind without deleting the live row
+        ArchivedServiceBooking.objects.create(
+            id=booking.pk, user=self.user, service=self.service, status=booking.status,
+            start_date=booking.start_date, created_at=booking.created_at,
+            updated_at=booking.updated_at,
+        )
+        self.assertEqual(archive_batch(before=date(2001, 1, 1)), (1, 0))
+        self.assertFalse(ServiceBooking.objects.exists())
+        self.assertEqual(ArchivedServiceBooking.objects.count(), 1)
+
+
+class CatalogImporterTests(MarketplaceTestCase):
+    def setUp(self):
+        self.dropped = make_service(self.provider, 'Video')
+        self.rows = [
+            (2, {'provider': 'Acme', 'name': 'Audio', 'price': '12.50', 'price_unit': 'per hour'}),
+            (3, {'provider': 'Acme', 'name': 'Lighting', 'price': '5', 'price_unit': 'per day'}),
+        ]
+
+    def test_dry_run_reports_diff_without_writing(self):
+        importer = CatalogImporter(dry_run=True)
+        stats = importer.run(self.rows)
+
+        self.assertEqual(importer.diff, {
+            'created': ['Acme / Lighting'],
+            'updated': ['Acme / Audio'],
+            'deactivated': ['Acme / Video'],
+        })
+        self.assertEqual(stats['services_deactivated'], 1)
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.price, Decimal('10.00'))
+        self.assertFalse(Service.objects.filter(name='Lighting').exists())
+        self.assertTrue(Service.objects.get(pk=self.dropped.pk).is_active)
+
+    def test_import_upserts_and_deactivates_missing(self):
+        importer = CatalogImporter()
+        importer.run(self.rows)
+
+        self.assertEqual(importer.errors, [])
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.price, Decimal('12.50'))
+        self.assertEqual(Service.objects.get(name='Lighting').price, Decimal('5.00'))
+        self.assertFalse(Service.objects.get(pk=self.dropped.pk).is_active)
+        self.assertEqual(importer.diff['deactivated'], ['Acme / Video'])
+
+    def test_rejected_rows_skip_deactivation(self):
+        rows = self.rows + [
+            (4, {'provider': 'Acme', 'name': 'Video', 'price': '-1', 'price_unit': 'per hour'}),
+            (5, {'provider': 'Acme', 'name': 'x' * 201, 'price': '1', 'price_unit': 'per hour'}),
+            (6, {'provider': 'Acme', 'name': 'Stage', 'price': 'NaN', 'price_unit': 'per hour'}),
+        ]
+        importer = CatalogImporter()
+        stats = importer.run(rows)
+
+        self.assertEqual(stats['errors'], 3)
+        self.assertEqual(importer.errors[:3], [
+            "Row 4: price '-1' is negative",
+            "Row 5: 'name' is longer than 200 characters",
+            "Row 6: invalid price 'NaN'",
+        ])
+        self.assertTrue(Service.objects.get(pk=self.dropped.pk).is_active)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class BucketStoreTests(TestCase):
+    def setUp(self):
+        self.store = BucketStore()
+        self.store.cache.clear()
+        self.now = 1000.0
+        patcher = mock.patch('services_marketplace.throttling.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def consume(self, key='bucket', capacity=2, period=60):
+        return self.store.consume(key, capacity, period)
+
+    def test_denies_when_empty_and_refills_over_time(self):
+        self.assertEqual(self.consume(), (True, 1))
+        self.assertEqual(self.consume(), (True, 0))
+        allowed, tokens = self.consume()
+        self.assertFalse(allowed)
+        self.assertEqual(tokens, 0)
+
+        # Two tokens per minute: half a minute refills one
+        self.now += 30
+        self.assertEqual(self.consume(), (True, 0))
+        self.assertFalse(self.consume()[0])
+
+    def test_refill_is_capped_at_capacity(self):
+        self.consume()
+        self.now += 3600
+        self.assertEqual(self.consume(), (True, 1))
+
+    def test_local_fallback_expires_and_prunes_buckets(self):
+        unavailable = mock.patch.object(
+            BucketStore, 'cache', new_callable=mock.PropertyMock,
+            side_effect=ConnectionError('cache down')
+        )
+        with unavailable, self.assertLogs('services_marketplace.throttling', 'WARNING'):
+            self.assertEqual(self.consume('old'), (True, 1))
+            self.assertEqual(self.consume('old'), (True, 0))
+            self.assertFalse(self.consume('old')[0])
+
+            self.now += 61
+            with mock.patch('services_marketplace.throttling.LOCAL_BUCKET_LIMIT', 1):
+                self.assertEqual(self.consume('new'), (True, 1))
+            self.assertEqual(set(self.store._local), {'new'})
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class RecommendationUserDeleteTests(MarketplaceTestCase):
+    def setUp(self):
+        self.other_service = make_service(self.provider, 'Video')
+        booking = self.book()
+        ServiceReview.objects.create(booking=booking, rating=4)
+        SavedService.objects.create(user=self.user, service=self.service)
+        refresh_user_recommendations(self.user.pk)
+
+    def test_changes_schedule_a_refresh(self):
+        with mock.patch('services_marketplace.recommendations.schedule_user_refresh') as schedule:
+            self.book(service=self.other_service)
+        schedule.assert_called_with(self.user.pk)
+
+    def test_deleting_user_schedules_no_refresh(self):
+        self.assertTrue(ServiceRecommendation.objects.filter(user=self.user).exists())
+        user_id = self.user.pk
+        with mock.patch('services_marketplace.recommendations.schedule_user_refresh') as schedule:
+            self.user.delete()
+        schedule.assert_not_called()
+        self.assertFalse(ServiceRecommendation.objects.filter(user_id=user_id).exists())
+
+    def test_refresh_for_deleted_user_writes_nothing(self):
+        user_id = self.user.pk
+        self.user.delete()
+        self.assertEqual(refresh_user_recommendations(user_id), 0)
+        self.assertFalse(ServiceRecommendation.objects.filter(user_id=user_id).exists())
@@ -0,0 +1,179 @@
+"""Token-bucket throttles for the marketplace API.
+
+Each bucket holds up to ``num`` tokens and refills at ``num`` per period, as
+configured in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` (e.g. ``'120/min'``).
+Buckets live in the shared Django cache so every worker sees the same state.
+With Redis each take is a single Lua script, so concurrent requests cannot
+spend the same token; other backends serialise takes within a process only.
+If the cache is unreachable buckets fall back to a per-process store.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DEEP_PAGE_THRESHOLD = 20
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_BUCKET_LIMIT = 10000
+
+# KEYS[1] = bucket hash, ARGV = capacity, period. Returns {allowed, tokens}.
+CONSUME_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * capacity / period)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(period))
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rate(rate):
+    """Parse ``'<num>/<period>'`` into (tokens, seconds), as DRF does"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def take_token(state, capacity, period, now):
+    """Refill ``state`` up to ``now`` and take one token if available.
+
+    Returns ``(allowed, tokens, updated)``.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - updated) * capacity / period)
+    if tokens < 1:
+        return False, tokens, now
+    return True, tokens - 1, now
+
+
+class BucketStore:
+    """Shared cache storage with an in-memory fallback"""
+
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'SERVICES_THROTTLE_CACHE', 'default')]
+
+    def consume(self, key, capacity, period):
+        """Take a token from bucket ``key``; returns ``(allowed, tokens_left)``"""
+        try:
+            cache = self.cache
+            if isinstance(cache, RedisCache):
+                return self._consume_redis(cache, key, capacity, period)
+            with self._lock:
+                allowed, tokens, updated = take_token(
+                    cache.get(key), capacity, period, time.time()
+                )
+                cache.set(key, (tokens, updated), period)
+            return allowed, tokens
+        except Exception:
+            logger.warning('Throttle cache unavailable, using in-memory buckets', exc_info=True)
+            return self._consume_local(key, capacity, period)
+
+    def _consume_redis(self, cache, key, capacity, period):
+        key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(key, write=True)
+        allowed, tokens = client.register_script(CONSUME_SCRIPT)(
+            keys=[key], args=[capacity, period]
+        )
+        return bool(int(allowed)), float(tokens)
+
+    def _consume_local(self, key, capacity, period):
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            state = entry[:2] if entry and entry[2] > now else None
+            allowed, tokens, updated = take_token(state, capacity, period, now)
+            self._local[key] = (tokens, updated, now + period)
+            if len(self._local) > LOCAL_BUCKET_LIMIT:
+                self._local = {
+                    bucket: entry for bucket, entry in self._local.items() if entry[2] > now
+                }
+        return allowed, tokens
+
+
+bucket_store = BucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base token-bucket throttle; subclasses choose the scope"""
+    scope = None
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    store = bucket_store
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_cache_key(self, request, view, scope):
+        return self.cache_format % {'scope': scope, 'ident': self.get_ident_for(request)}
+
+    def get_rate(self, scope):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = self.get_rate(scope) if scope else None
+        if rate is None:
+            return True
+        key = self.get_cache_key(request, view, scope)
+        if key is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        allowed, tokens = self.store.consume(key, capacity, period)
+        if not allowed:
+            self.wait_seconds = (1 - tokens) * period / capacity
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return f'ip-{self.get_ident(request)}'
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Overall request budget per user (or client IP when anonymous)"""
+    scope = 'user'
+
+
+class EndpointTokenBucketThrottle(TokenBucketThrottle):
+    """Per-user budget for expensive endpoint classes.
+
+    Searches and deep pagination are classified from the query string; views
+    can also opt in with a ``throttle_endpoint_class`` attribute. Requests
+    that fall in no class are not limited by this throttle.
+    """
+
+    def get_scope(self, request, view):
+        params = request.query_params
+        if params.get(api_settings.SEARCH_PARAM):
+            return 'search'
+        page = params.get('page', '')
+        if page.isdigit() and int(page) > DEEP_PAGE_THRESHOLD:
+            return 'deep_pagination'
+        return getattr(view, 'throttle_endpoint_class', None)
@@ -13,5 +13,6 @@ router.register(r'saved-services', views.SavedServiceViewSet, basename='saved-se
 app_name = 'services_marketplace'
 
 urlpatterns = [
+    path('batch/', views.BatchRequestView.as_view(), name='batch'),
     path('', include(router.urls)),
 ]
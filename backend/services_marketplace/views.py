@@ -1,17 +1,26 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django_filters.rest_framework import DjangoFilterBackend
+from django.core.cache import cache
 from django.db.models import Q, Avg, Count
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 
 from .models import (
     ServiceCategory, ServiceProvider, Service, 
-    ServiceBooking, ServiceReview, SavedService
+    ServiceBooking, ServiceReview, SavedService, ServiceRecommendation,
+    ArchivedServiceBooking, ArchivedServiceReview
 )
+from .archive import merge_history
+from .batch import get_batch_limits, run_batch
+from .filter_backends import LazyDjangoFilterBackend
+from .facets import FACET_CACHE_TIMEOUT, facet_cache_key, service_facets
 from .serializers import (
     ServiceCategorySerializer, ServiceProviderSerializer, ServiceSerializer,
-    ServiceBookingSerializer, ServiceReviewSerializer, SavedServiceSerializer
+    ServiceBookingSerializer, ServiceReviewSerializer, SavedServiceSerializer,
+    BatchRequestSerializer
 )
 
 class ServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -29,7 +38,7 @@ class ServiceProviderViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ServiceProvider.objects.filter(is_active=True)
     serializer_class = ServiceProviderSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, LazyDjangoFilterBackend]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
@@ -39,7 +48,7 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing and filtering services"""
     serializer_class = ServiceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, LazyDjangoFilterBackend]
     search_fields = ['name', 'description', 'provider__name']
     ordering_fields = ['name', 'price', 'created_at']
     ordering = ['name']
@@ -73,11 +82,87 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(similar_services, many=True)
         return Response(serializer.data)
 
-class ServiceBookingViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Get filter counts for the current search/filter state"""
+        cache_key = facet_cache_key(request.query_params)
+        data = cache.get(cache_key)
+        if data is None:
+            data = service_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(cache_key, data, FACET_CACHE_TIMEOUT)
+        response = Response(data)
+        # Lets CompressionMiddleware reuse the cached compressed bytes
+        response.compression_cache_key = cache_key
+        return response
+
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        """Get services recommended for the current user.
+
+        Candidates are precomputed by ``refresh_recommendations`` and kept
+        current as the user books, saves and reviews services.
+        """
+        recommendations = ServiceRecommendation.objects.filter(
+            user=request.user,
+            service__is_active=True
+        ).select_related('service__provider', 'service__category').order_by('rank')
+
+        page = self.paginate_queryset(recommendations)
+        if page is not None:
+            serializer = self.get_serializer([r.service for r in page], many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([r.service for r in recommendations], many=True)
+        return Response(serializer.data)
+
+class ArchiveHistoryMixin:
+    """Adds ``?include_archived=true`` to list and retrieve.
+
+    Archived rows are read-only history; they are merged with the live rows
+    using the same filters and ordering.
+    """
+
+    def get_archive_queryset(self):
+        raise NotImplementedError
+
+    def include_archived(self):
+        value = self.request.query_params.get('include_archived', '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+
+        live = self.filter_queryset(self.get_queryset())
+        archived = self.filter_queryset(self.get_archive_queryset())
+        ordering = filters.OrderingFilter().get_ordering(request, live, self)
+        history = merge_history([live, archived], ordering)
+
+        page = self.paginate_queryset(history)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(history, many=True)
+        return Response(serializer.data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != 'retrieve' or not self.include_archived():
+                raise
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return get_object_or_404(
+            self.get_archive_queryset(),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+class ServiceBookingViewSet(ArchiveHistoryMixin, viewsets.ModelViewSet):
     """ViewSet for managing service bookings"""
     serializer_class = ServiceBookingSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+    filter_backends = [filters.OrderingFilter, LazyDjangoFilterBackend]
     ordering_fields = ['start_date', 'created_at']
     ordering = ['-start_date']
     filterset_fields = ['status', 'service', 'service__provider']
@@ -85,16 +170,19 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Users can only see their own bookings
         return ServiceBooking.objects.filter(user=self.request.user)
+
+    def get_archive_queryset(self):
+        return ArchivedServiceBooking.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
         # Automatically set the user to the current user when creating a booking
         serializer.save(user=self.request.user)
 
-class ServiceReviewViewSet(viewsets.ModelViewSet):
+class ServiceReviewViewSet(ArchiveHistoryMixin, viewsets.ModelViewSet):
     """ViewSet for managing service reviews"""
     serializer_class = ServiceReviewSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+    filter_backends = [filters.OrderingFilter, LazyDjangoFilterBackend]
     ordering_fields = ['rating', 'created_at']
     ordering = ['-created_at']
     filterset_fields = ['rating', 'booking__service', 'booking__user']
@@ -102,6 +190,9 @@ class ServiceReviewViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Users can only see reviews for their own bookings
         return ServiceReview.objects.filter(booking__user=self.request.user)
+
+    def get_archive_queryset(self):
+        return ArchivedServiceReview.objects.filter(booking__user=self.request.user)
     
     def perform_create(self, serializer):
         # Ensure the user can only review their own bookings
@@ -114,7 +205,7 @@ class SavedServiceViewSet(viewsets.ModelViewSet):
     """ViewSet for managing saved services"""
     serializer_class = SavedServiceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+    filter_backends = [filters.OrderingFilter, LazyDjangoFilterBackend]
     ordering_fields = ['created_at']
     ordering = ['-created_at']
     filterset_fields = ['service', 'service__category']
@@ -126,3 +217,21 @@ class SavedServiceViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         # Automatically set the user to the current user when saving a service
         serializer.save(user=self.request.user)
+
+class BatchRequestView(APIView):
+    """Run several GET requests to the marketplace routes in one round trip"""
+    permission_classes = [IsAuthenticated]
+    throttle_endpoint_class = 'batch'
+
+    def post(self, request):
+        max_requests, _ = get_batch_limits()
+        serializer = BatchRequestSerializer(
+            data=request.data, context={'max_requests': max_requests}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        urls = [sub['path'] for sub in serializer.validated_data['requests']]
+        responses = run_batch(
+            request, urls, concurrent=serializer.validated_data['concurrent']
+        )
+        return Response({'responses': responses})